@@ -0,0 +1,26 @@
+"""Add id to media captured_at index for keyset pagination
+
+Revision ID: 0b84d5e3a6c9
+Revises: f2a7c3e85d16
+Create Date: 2026-10-15 13:20:08.513427
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b84d5e3a6c9'
+down_revision = 'f2a7c3e85d16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index('idx_media_captured_at', table_name='media')
+    op.create_index('idx_media_captured_at', 'media', ['captured_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_media_captured_at', table_name='media')
+    op.create_index('idx_media_captured_at', 'media', ['captured_at'], unique=False)
@@ -0,0 +1,30 @@
+"""Replace media captured_at index with active newest-first index
+
+Revision ID: 4c1f6b82e9d7
+Revises: 7d3e9a1f0c52
+Create Date: 2026-10-15 14:31:46.220953
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1f6b82e9d7'
+down_revision = '7d3e9a1f0c52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_media_active_captured', 'media',
+        ['deleted_at', sa.text('captured_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+    op.drop_index('idx_media_captured_at', table_name='media')
+
+
+def downgrade() -> None:
+    op.create_index('idx_media_captured_at', 'media', ['captured_at', 'id'], unique=False)
+    op.drop_index('idx_media_active_captured', table_name='media')
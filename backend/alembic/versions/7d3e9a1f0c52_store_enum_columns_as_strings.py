@@ -0,0 +1,53 @@
+"""Store enum columns as strings with check constraints
+
+Revision ID: 7d3e9a1f0c52
+Revises: 0b84d5e3a6c9
+Create Date: 2026-10-15 13:52:37.904116
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3e9a1f0c52'
+down_revision = '0b84d5e3a6c9'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, enum type name, allowed values)
+ENUM_COLUMNS = [
+    ('media_sources', 'kind', 'mediasourcekind', ('VIDEOTAPE', 'ICLOUD', 'GOOGLE_PHOTOS', 'GOOGLE_DRIVE', 'GUEST_UPLOAD', 'USER_UPLOAD')),
+    ('users', 'role', 'userrole', ('ADMIN', 'USER', 'GUEST')),
+    ('media', 'kind', 'mediakind', ('PHOTO', 'VIDEO')),
+    ('media', 'visibility', 'visibility', ('PRIVATE', 'LINK', 'AUTHED')),
+    ('media', 'status', 'status', ('READY', 'PROCESSING', 'FAILED')),
+    ('media_assets', 'asset_type', 'assettype', ('THUMBNAIL', 'PREVIEW', 'TRANSCODE', 'SUBTITLE')),
+    ('media_assets', 'status', 'status', ('READY', 'PROCESSING', 'FAILED')),
+    ('notifications', 'event_type', 'notificationeventtype', ('USER_CREATED', 'MEDIA_UPLOADED', 'COMMENT_ADDED', 'TAG_ADDED')),
+    ('notifications', 'status', 'notificationstatus', ('PENDING', 'SENT', 'FAILED')),
+    ('imports', 'source', 'mediasourcekind', ('VIDEOTAPE', 'ICLOUD', 'GOOGLE_PHOTOS', 'GOOGLE_DRIVE', 'GUEST_UPLOAD', 'USER_UPLOAD')),
+    ('imports', 'status', 'importstatus', ('PENDING', 'IMPORTED', 'SKIPPED_DUP', 'FAILED')),
+]
+
+
+def upgrade() -> None:
+    for table, column, enum_name, values in ENUM_COLUMNS:
+        op.alter_column(table, column,
+                        existing_type=sa.Enum(*values, name=enum_name),
+                        type_=sa.String(length=16),
+                        existing_nullable=False)
+        op.create_check_constraint(
+            f'ck_{table}_{column}', table,
+            f"{column} IN ({', '.join(repr(value) for value in values)})"
+        )
+
+
+def downgrade() -> None:
+    for table, column, enum_name, values in reversed(ENUM_COLUMNS):
+        op.drop_constraint(f'ck_{table}_{column}', table, type_='check')
+        op.alter_column(table, column,
+                        existing_type=sa.String(length=16),
+                        type_=sa.Enum(*values, name=enum_name),
+                        existing_nullable=False)
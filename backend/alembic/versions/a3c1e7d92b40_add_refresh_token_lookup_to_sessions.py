@@ -0,0 +1,27 @@
+"""Add refresh_token_lookup to sessions
+
+Revision ID: a3c1e7d92b40
+Revises: 5fa9884fc081
+Create Date: 2026-10-15 09:12:04.318220
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c1e7d92b40'
+down_revision = '5fa9884fc081'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing sessions have no lookup digest; their holders must log in again.
+    op.add_column('sessions', sa.Column('refresh_token_lookup', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_sessions_refresh_token_lookup'), 'sessions', ['refresh_token_lookup'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sessions_refresh_token_lookup'), table_name='sessions')
+    op.drop_column('sessions', 'refresh_token_lookup')
@@ -0,0 +1,26 @@
+"""Add live sessions index
+
+Revision ID: c58e2f1d7a93
+Revises: a3c1e7d92b40
+Create Date: 2026-10-15 10:02:47.905113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c58e2f1d7a93'
+down_revision = 'a3c1e7d92b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # MySQL has no partial indexes; leading with revoked_at lets
+    # "revoked_at IS NULL AND expires_at > now()" resolve as one range scan.
+    op.create_index('idx_sessions_live', 'sessions', ['revoked_at', 'expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_sessions_live', table_name='sessions')
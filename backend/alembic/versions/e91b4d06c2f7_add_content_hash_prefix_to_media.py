@@ -0,0 +1,26 @@
+"""Add content_hash_prefix to media
+
+Revision ID: e91b4d06c2f7
+Revises: c58e2f1d7a93
+Create Date: 2026-10-15 11:26:13.640482
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e91b4d06c2f7'
+down_revision = 'c58e2f1d7a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('media', sa.Column('content_hash_prefix', sa.String(length=16), nullable=True))
+    op.create_index(op.f('ix_media_content_hash_prefix'), 'media', ['content_hash_prefix'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_media_content_hash_prefix'), table_name='media')
+    op.drop_column('media', 'content_hash_prefix')
@@ -0,0 +1,31 @@
+"""Add unique index on active tape numbers
+
+Revision ID: f2a7c3e85d16
+Revises: e91b4d06c2f7
+Create Date: 2026-10-15 12:41:55.172306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a7c3e85d16'
+down_revision = 'e91b4d06c2f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('media', sa.Column(
+        'live_tape_number',
+        sa.String(length=32),
+        sa.Computed('CASE WHEN deleted_at IS NULL THEN tape_number END'),
+        nullable=True
+    ))
+    op.create_index('uq_media_tape_active', 'media', ['source_id', 'live_tape_number'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_media_tape_active', table_name='media')
+    op.drop_column('media', 'live_tape_number')
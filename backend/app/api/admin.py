@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from typing import List
+from datetime import datetime
 from pydantic import BaseModel
 
 from ..core.database import get_db
 from ..models.database import User
-from ..api.auth import get_current_user, UserResponse
+from ..api.auth import require_admin, invalidate_cached_user, UserResponse
 
 router = APIRouter()
 
@@ -16,35 +18,23 @@ class UserUpdate(BaseModel):
 
 
 @router.get("/users", response_model=List[UserResponse])
-async def get_users(
+def get_users(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_admin)
 ):
     """Get all users (admin only)"""
-    if current_user.role != "ADMIN":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can view all users"
-        )
-    
     users = db.query(User).filter(User.deleted_at.is_(None)).all()
     return users
 
 
 @router.patch("/users/{user_id}")
-async def update_user(
+def update_user(
     user_id: int,
     user_update: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_admin)
 ):
     """Update user role or block status (admin only)"""
-    if current_user.role != "ADMIN":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can update users"
-        )
-    
     user = db.query(User).filter(User.id == user_id, User.deleted_at.is_(None)).first()
     if not user:
         raise HTTPException(
@@ -59,33 +49,32 @@ async def update_user(
         user.is_blocked = user_update.is_blocked
     
     db.commit()
+    invalidate_cached_user(user_id)
     
     return {"message": "User updated successfully"}
 
 
 @router.delete("/users/{user_id}")
-async def delete_user(
+def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_admin)
 ):
     """Soft delete user (admin only)"""
-    if current_user.role != "ADMIN":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can delete users"
-        )
+    # Soft delete in a single UPDATE
+    deleted = db.execute(
+        update(User)
+        .where(User.id == user_id, User.deleted_at.is_(None))
+        .values(deleted_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    invalidate_cached_user(user_id)
     
-    user = db.query(User).filter(User.id == user_id, User.deleted_at.is_(None)).first()
-    if not user:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    # Soft delete
-    from datetime import datetime
-    user.deleted_at = datetime.utcnow()
-    db.commit()
-    
     return {"message": "User deleted successfully"}
@@ -1,23 +1,44 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.orm import Session, make_transient_to_detached
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from typing import Dict, Optional
+from cachetools import TTLCache
+import hashlib
+import hmac
+import threading
+import time
+import jwt
 from pydantic import BaseModel, EmailStr, validator
 
 from ..core.database import get_db
 from ..core.config import settings
-from ..models.database import User, Session as UserSession
-from ..services.auth_service import AuthService
+from ..models.database import User, UserRole, Session as UserSession
+from ..services.auth_service import AuthService, verify_password, get_password_hash, dummy_verify_password
 
 router = APIRouter()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Accepted JWT algorithms, pinned once instead of rebuilt per request
+_JWT_ALGORITHMS = [settings.algorithm]
+
+# Verified access tokens (by digest) -> (exp, user generation, detached User snapshot).
+# Entries are kept for at most 30 seconds, which bounds staleness across worker processes.
+_token_cache = TTLCache(maxsize=10000, ttl=30)
+_token_cache_lock = threading.Lock()
+
+# user_id -> generation, bumped when an admin changes or deletes the user so
+# this process stops trusting that user's cached snapshots immediately
+_user_generations: Dict[int, int] = {}
+
+
+def invalidate_cached_user(user_id: int):
+    """Drop cached snapshots of a user whose role, block status or deletion changed"""
+    with _token_cache_lock:
+        _user_generations[user_id] = _user_generations.get(user_id, 0) + 1
+
 
 class Token(BaseModel):
     access_token: str
@@ -55,14 +76,6 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -80,28 +93,69 @@ def create_refresh_token() -> str:
     return secrets.token_urlsafe(32)
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_refresh_token_lookup(refresh_token: str) -> str:
+    """Keyed SHA-256 digest of a refresh token, used to find its session by index"""
+    return hmac.new(settings.secret_key.encode(), refresh_token.encode(), hashlib.sha256).hexdigest()
+
+
+def _detached_user_snapshot(user: User) -> User:
+    """Copy the user's column values into a detached instance safe to share across sessions"""
+    snapshot = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    # The key never leaves the process, so a short BLAKE2b digest is enough
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _token_cache_lock:
+        cached = _token_cache.get(cache_key)
+        if cached is not None and cached[1] != _user_generations.get(cached[2].id, 0):
+            cached = None
+    if cached is not None and cached[0] > time.time():
+        # Attach the snapshot to this request's session without a SELECT
+        return db.merge(cached[2], load=False)
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        payload = jwt.decode(token, settings.secret_key, algorithms=_JWT_ALGORITHMS)
         user_id: int = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-    except JWTError:
+        user_id = int(user_id)
+    except (jwt.PyJWTError, ValueError):
         raise credentials_exception
     
+    # Read the generation before the user row, so a change committed in between
+    # leaves the cached entry already outdated
+    with _token_cache_lock:
+        generation = _user_generations.get(user_id, 0)
+    
     user = db.query(User).filter(User.id == user_id, User.deleted_at.is_(None)).first()
     if user is None or user.is_blocked:
         raise credentials_exception
+    
+    with _token_cache_lock:
+        _token_cache[cache_key] = (payload["exp"], generation, _detached_user_snapshot(user))
     return user
 
 
+async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Dependency that only admits admin users"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user (requires admin approval)"""
     # Check if user already exists
     existing_user = db.query(User).filter(User.email == user_data.email).first()
@@ -118,23 +172,30 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         email=user_data.email,
         phone=user_data.phone,
         password_hash=hashed_password,
-        role="USER"  # Default role, admin can change
+        role="USER",  # Default role, admin can change
+        created_at=datetime.utcnow()
     )
     
     db.add(user)
+    db.flush()
+    
+    # Every response field is set once the INSERT is flushed, so build the
+    # response now rather than reloading the row after commit
+    response = UserResponse.model_validate(user)
     db.commit()
-    db.refresh(user)
     
     # TODO: Send notification to admin about new user
     
-    return user
+    return response
 
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """Login with email and password"""
     user = db.query(User).filter(User.email == form_data.username, User.deleted_at.is_(None)).first()
     
+    if not user:
+        dummy_verify_password(form_data.password)
     if not user or not verify_password(form_data.password, user.password_hash) or user.is_blocked:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -149,13 +210,16 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     )
     
     # Create refresh token
+    # The token is 256 random bits, so a fast hash is enough at rest; bcrypt
+    # is reserved for user passwords
     refresh_token = create_refresh_token()
-    refresh_token_hash = get_password_hash(refresh_token)
+    refresh_token_hash = hashlib.sha256(refresh_token.encode()).hexdigest()
     
     # Store refresh token in database
     user_session = UserSession(
         user_id=user.id,
         refresh_token_hash=refresh_token_hash,
+        refresh_token_lookup=get_refresh_token_lookup(refresh_token),
         expires_at=datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
     )
     db.add(user_session)
@@ -169,20 +233,21 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(request: dict, db: Session = Depends(get_db)):
-    refresh_token = request.get("refresh_token")
+def refresh_token(request: dict, db: Session = Depends(get_db)):
     """Refresh access token using refresh token"""
+    refresh_token = request.get("refresh_token")
+    if not refresh_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+    
     # Find session by refresh token
-    sessions = db.query(UserSession).filter(
+    valid_session = db.query(UserSession).filter(
+        UserSession.refresh_token_lookup == get_refresh_token_lookup(refresh_token),
         UserSession.expires_at > datetime.utcnow(),
         UserSession.revoked_at.is_(None)
-    ).all()
-    
-    valid_session = None
-    for session in sessions:
-        if verify_password(refresh_token, session.refresh_token_hash):
-            valid_session = session
-            break
+    ).first()
     
     if not valid_session:
         raise HTTPException(
@@ -212,7 +277,11 @@ async def refresh_token(request: dict, db: Session = Depends(get_db)):
 
 
 @router.post("/logout")
-async def logout(request: dict = None, db: Session = Depends(get_db)):
+def logout(
+    request: dict = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """Logout by revoking refresh token"""
     if not request or "refresh_token" not in request:
         raise HTTPException(
@@ -220,17 +289,23 @@ async def logout(request: dict = None, db: Session = Depends(get_db)):
             detail="Refresh token required"
         )
     refresh_token = request.get("refresh_token")
-    # Find and revoke session
-    sessions = db.query(UserSession).filter(
-        UserSession.expires_at > datetime.utcnow(),
-        UserSession.revoked_at.is_(None)
-    ).all()
+    # Find and revoke session in a single UPDATE
+    now = datetime.utcnow()
+    revoked = db.execute(
+        update(UserSession)
+        .where(
+            UserSession.user_id == current_user.id,
+            UserSession.refresh_token_lookup == get_refresh_token_lookup(refresh_token),
+            UserSession.expires_at > now,
+            UserSession.revoked_at.is_(None)
+        )
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
     
-    for session in sessions:
-        if verify_password(refresh_token, session.refresh_token_hash):
-            session.revoked_at = datetime.utcnow()
-            db.commit()
-            return {"message": "Successfully logged out"}
+    if revoked:
+        return {"message": "Successfully logged out"}
     
     raise HTTPException(
         status_code=status.HTTP_400_BAD_REQUEST,
@@ -1,24 +1,149 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Request
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from functools import lru_cache
 from datetime import datetime
 from pydantic import BaseModel
+from cachetools import TTLCache
 import os
 import uuid
 import mimetypes
 import hashlib
+import re
+import threading
 
+from ..core.config import settings
 from ..core.database import get_db
-from ..models.database import User, Media, MediaSource as MediaSourceModel, Tag, MediaTag, Comment
+from ..models.database import User, UserRole, Media, MediaSource as MediaSourceModel, Tag, MediaTag, Comment
 from ..models.media_source import MediaDTO, get_media_source
 from ..services.media_service import MediaService
 from ..services.thumbnail_service import ThumbnailService
-from .auth import get_current_user
+from .auth import get_current_user, require_admin
 
 router = APIRouter()
 
+# Chunk size for upload hashing; 1 MiB keeps hashlib releasing the GIL
+_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Leading bytes hashed for the cheap duplicate probe before a full copy
+_HASH_PREFIX_BYTES = 1024 * 1024
+
+# Chunk size for ranged streaming; large chunks keep per-chunk threadpool hops rare
+_STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Upload extension whitelist and its error message, built once
+_ALLOWED_EXTENSIONS = frozenset(settings.allowed_extensions)
+_ALLOWED_EXTENSIONS_MESSAGE = f"File type not allowed. Allowed types: {', '.join(settings.allowed_extensions)}"
+
+# Thumbnail generator shared by all uploads; it holds no per-request state
+_thumbnail_service = ThumbnailService()
+
+# Rendered first pages of the media list keyed by their filters. Later pages
+# aren't cached, so arbitrary cursors can't evict the hot entries. Writes in
+# this process clear it; other workers keep serving their copy until it
+# expires, so media_list_cache_ttl bounds how stale a list can be.
+_list_cache = TTLCache(maxsize=1024, ttl=settings.media_list_cache_ttl)
+_list_cache_lock = threading.Lock()
+
+# Single byte range, e.g. "bytes=0-1023", "bytes=1024-" or "bytes=-500"
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _save_and_hash(file_obj, dest_path: str) -> Tuple[str, int]:
+    """Copy an upload to dest_path, returning its SHA-256 hex digest and byte size"""
+    hasher = hashlib.sha256()
+    byte_size = 0
+    with open(dest_path, "wb") as buffer:
+        while chunk := file_obj.read(_UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+            buffer.write(chunk)
+            byte_size += len(chunk)
+    return hasher.hexdigest(), byte_size
+
+
+def _hash_file(file_obj) -> str:
+    """SHA-256 hex digest of a whole upload, leaving it rewound"""
+    hasher = hashlib.sha256()
+    file_obj.seek(0)
+    while chunk := file_obj.read(_UPLOAD_CHUNK_SIZE):
+        hasher.update(chunk)
+    file_obj.seek(0)
+    return hasher.hexdigest()
+
+
+@lru_cache(maxsize=64)
+def _guess_mime(ext: str) -> str:
+    """Content type for a lowercased file extension"""
+    content_type, _ = mimetypes.guess_type(f"x{ext}")
+    return content_type or "application/octet-stream"
+
+
+def _parse_range(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a Range header into inclusive (start, end) byte offsets
+    
+    Returns None for multi-range requests, which are answered with the full
+    file. Raises 416 for malformed or unsatisfiable ranges.
+    """
+    if ',' in range_header:
+        return None
+    
+    not_satisfiable = HTTPException(
+        status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        detail="Requested range not satisfiable",
+        headers={'Content-Range': f'bytes */{file_size}'}
+    )
+    
+    match = _RANGE_RE.match(range_header.strip())
+    if not match or not (match.group(1) or match.group(2)):
+        raise not_satisfiable
+    
+    if not match.group(1):
+        # Suffix range: the last N bytes
+        suffix_length = int(match.group(2))
+        if suffix_length == 0:
+            raise not_satisfiable
+        start = max(file_size - suffix_length, 0)
+        end = file_size - 1
+    else:
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else file_size - 1
+        if end < start:
+            raise not_satisfiable
+    
+    if start >= file_size:
+        raise not_satisfiable
+    
+    # Ensure end doesn't exceed file size
+    return start, min(end, file_size - 1)
+
+
+def _invalidate_list_cache() -> None:
+    """Drop cached media list pages after a write"""
+    with _list_cache_lock:
+        _list_cache.clear()
+
+
+def _encode_cursor(media: Media) -> str:
+    """Keyset cursor for the item after which the next page starts"""
+    captured_at = media.captured_at.isoformat() if media.captured_at else ""
+    return f"{captured_at}|{media.id}"
+
+
+def _parse_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Parse a cursor made by _encode_cursor into (captured_at, id)"""
+    try:
+        captured_at, media_id = cursor.split("|")
+        return (datetime.fromisoformat(captured_at) if captured_at else None), int(media_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
 
 class MediaCreate(BaseModel):
     kind: str  # PHOTO, VIDEO
@@ -79,8 +204,8 @@ class CommentResponse(BaseModel):
         from_attributes = True
 
 
-@router.get("/", response_model=List[MediaResponse])
-async def get_media(
+@router.get("/", response_model=None, responses={200: {"model": List[MediaResponse]}})
+def get_media(
     date_from: Optional[datetime] = Query(None),
     date_to: Optional[datetime] = Query(None),
     tag_ids: Optional[List[int]] = Query(None),
@@ -88,10 +213,26 @@ async def get_media(
     tape_number: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get media with filters"""
+    """
+    Get media with filters, newest first
+    
+    Pass the X-Next-Cursor header of a page as `cursor` to fetch the next one;
+    unlike `skip`, the cost doesn't grow with the page number.
+    """
+    # Only first pages are cached; deeper pages are rarely requested twice
+    cache_key = cached = None
+    if skip == 0 and cursor is None:
+        cache_key = (date_from, date_to, tuple(tag_ids or ()), source, tape_number, limit)
+        with _list_cache_lock:
+            cached = _list_cache.get(cache_key)
+    if cached is not None:
+        body, headers = cached
+        return Response(content=body, media_type="application/json", headers=headers)
+    
     media_service = MediaService(db)
     media_items = media_service.get_media(
         date_from=date_from,
@@ -100,44 +241,50 @@ async def get_media(
         source=source,
         tape_number=tape_number,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=_parse_cursor(cursor) if cursor else None
     )
     
-    # Convert to response format
-    result = []
-    for media in media_items:
-        # Get tags for this media
-        tags = [mt.tag.name for mt in media.media_tags]
-        
-        # Get comments count
-        comments_count = len([c for c in media.comments if c.deleted_at is None])
-        
-        result.append(MediaResponse(
-            id=media.id,
-            kind=media.kind.value,
-            title=media.title,
-            description=media.description,
-            filename=media.filename,
-            byte_size=media.byte_size,
-            duration_sec=media.duration_sec,
-            width=media.width,
-            height=media.height,
-            captured_at=media.captured_at,
-            tape_number=media.tape_number,
-            source_kind=media.source.kind.value,
-            visibility=media.visibility.value,
-            status=media.status.value,
-            created_at=media.created_at,
-            tags=tags,
-            comments_count=comments_count,
-            thumbnail_path=media.thumbnail_path
-        ))
+    # Get tags and comments counts for the whole page in one query each
+    media_ids = [media.id for media in media_items]
+    tags_by_media = media_service.get_tag_names(media_ids)
+    comments_counts = media_service.get_comment_counts(media_ids)
+    
+    # Rows come straight from the database, so serialize plain dicts with
+    # orjson instead of validating every item through MediaResponse
+    headers = {"X-Next-Cursor": _encode_cursor(media_items[-1])} if len(media_items) == limit else None
+    response = ORJSONResponse([
+        {
+            "id": media.id,
+            "kind": media.kind,
+            "title": media.title,
+            "description": media.description,
+            "filename": media.filename,
+            "byte_size": media.byte_size,
+            "duration_sec": media.duration_sec,
+            "width": media.width,
+            "height": media.height,
+            "captured_at": media.captured_at,
+            "tape_number": media.tape_number,
+            "source_kind": media.source.kind,
+            "visibility": media.visibility,
+            "status": media.status,
+            "created_at": media.created_at,
+            "tags": tags_by_media.get(media.id, []),
+            "comments_count": comments_counts.get(media.id, 0),
+            "thumbnail_path": media.thumbnail_path,
+        }
+        for media in media_items
+    ], headers=headers)
     
-    return result
+    if cache_key is not None:
+        with _list_cache_lock:
+            _list_cache[cache_key] = (response.body, headers)
+    return response
 
 
 @router.get("/{media_id}", response_model=MediaResponse)
-async def get_media_by_id(
+def get_media_by_id(
     media_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -156,11 +303,11 @@ async def get_media_by_id(
     tags = [mt.tag.name for mt in media.media_tags]
     
     # Get comments count
-    comments_count = len([c for c in media.comments if c.deleted_at is None])
+    comments_count = media_service.get_comments_count(media_id)
     
     return MediaResponse(
         id=media.id,
-        kind=media.kind.value,
+        kind=media.kind,
         title=media.title,
         description=media.description,
         filename=media.filename,
@@ -170,9 +317,9 @@ async def get_media_by_id(
         height=media.height,
         captured_at=media.captured_at,
         tape_number=media.tape_number,
-        source_kind=media.source.kind.value,
-        visibility=media.visibility.value,
-        status=media.status.value,
+        source_kind=media.source.kind,
+        visibility=media.visibility,
+        status=media.status,
         created_at=media.created_at,
         tags=tags,
         comments_count=comments_count,
@@ -181,18 +328,12 @@ async def get_media_by_id(
 
 
 @router.post("/", response_model=MediaResponse)
-async def create_media(
+def create_media(
     media_data: MediaCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_admin)
 ):
     """Create new media (admin only for now)"""
-    if current_user.role != "ADMIN":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can create media"
-        )
-    
     media_service = MediaService(db)
     
     # Convert to DTO
@@ -209,13 +350,14 @@ async def create_media(
     
     try:
         media = media_service.create_media(media_dto, current_user.id)
+        _invalidate_list_cache()
         
         # Get tags for response
         tags = [mt.tag.name for mt in media.media_tags]
         
         return MediaResponse(
             id=media.id,
-            kind=media.kind.value,
+            kind=media.kind,
             title=media.title,
             description=media.description,
             filename=media.filename,
@@ -225,9 +367,9 @@ async def create_media(
             height=media.height,
             captured_at=media.captured_at,
             tape_number=media.tape_number,
-            source_kind=media.source.kind.value,
-            visibility=media.visibility.value,
-            status=media.status.value,
+            source_kind=media.source.kind,
+            visibility=media.visibility,
+            status=media.status,
             created_at=media.created_at,
             tags=tags,
             comments_count=0,
@@ -240,8 +382,10 @@ async def create_media(
         )
 
 
+# A plain def like the other routes: hashing, copying, database work and
+# thumbnailing all block, so the whole handler runs in FastAPI's threadpool
 @router.post("/upload", response_model=MediaResponse)
-async def upload_media(
+def upload_media(
     file: UploadFile = File(...),
     kind: str = Form(...),
     source_kind: str = Form(...),
@@ -250,22 +394,15 @@ async def upload_media(
     tape_number: Optional[str] = Form(None),
     tags: Optional[str] = Form(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_admin)
 ):
     """Upload media file"""
-    if current_user.role != "ADMIN":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only admins can upload media"
-        )
-    
     # Validate file type
-    allowed_extensions = ['.mp4', '.mov', '.jpg', '.jpeg', '.png', '.heic', '.webp']
     file_ext = os.path.splitext(file.filename)[1].lower()
-    if file_ext not in allowed_extensions:
+    if file_ext not in _ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}"
+            detail=_ALLOWED_EXTENSIONS_MESSAGE
         )
     
     # Generate unique filename
@@ -312,11 +449,34 @@ async def upload_media(
                 db.commit()
                 print(f"Soft-deleted media with tape number '{tape_number}' permanently deleted")
     
-    # Read file content once
-    content = await file.read()
+    # Cheap duplicate probe: only when an active file shares the size and the
+    # hash of the first MiB is the full hash worth computing before any copy
+    head = file.file.read(_HASH_PREFIX_BYTES)
+    content_hash_prefix = hashlib.sha256(head).hexdigest()[:16]
+    file.file.seek(0)
+    if file.size is not None:
+        candidate = db.query(Media.content_hash, Media.title, Media.filename).filter(
+            Media.content_hash_prefix == content_hash_prefix,
+            Media.byte_size == file.size,
+            Media.deleted_at.is_(None)
+        ).first()
+        if candidate and _hash_file(file.file) == candidate.content_hash:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Duplicate file detected. A file with the same content already exists: {candidate.title or candidate.filename}"
+            )
     
-    # Calculate file hash for duplicate detection
-    content_hash = hashlib.sha256(content).hexdigest()
+    # Stream the upload to a temporary file, hashing it on the way through
+    tmp_path = f"{file_path}.part"
+    try:
+        content_hash, byte_size = _save_and_hash(file.file, tmp_path)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save file: {str(e)}"
+        )
     
     # Check for duplicate files BEFORE any operations (including soft-deleted ones)
     existing_media = db.query(Media).filter(
@@ -326,6 +486,7 @@ async def upload_media(
     if existing_media:
         if existing_media.deleted_at is None:
             # Active duplicate - reject immediately
+            os.remove(tmp_path)
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=f"Duplicate file detected. A file with the same content already exists: {existing_media.title or existing_media.filename}"
@@ -363,21 +524,23 @@ async def upload_media(
         
         # Update media with file information (content_hash already set in create_media)
         media.filename = filename
-        media.byte_size = len(content)
+        media.byte_size = byte_size
+        media.content_hash_prefix = content_hash_prefix
         media.storage_path = file_path  # Set the storage path
         media.status = "READY"  # For uploaded files, mark as ready
         
         # Commit database transaction first
         db.commit()
         
-        # Only save file to disk AFTER successful database commit
+        # Only move the file into place AFTER successful database commit
         try:
-            with open(file_path, "wb") as buffer:
-                buffer.write(content)
+            os.replace(tmp_path, file_path)
         except Exception as e:
             # If file save fails, clean up the database record
+            os.remove(tmp_path)
             db.delete(media)
             db.commit()
+            _invalidate_list_cache()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to save file: {str(e)}"
@@ -385,8 +548,7 @@ async def upload_media(
         
         # Generate thumbnail after file is saved
         try:
-            thumbnail_service = ThumbnailService()
-            thumbnail_path = thumbnail_service.generate_thumbnail(file_path, kind, media.id)
+            thumbnail_path = _thumbnail_service.generate_thumbnail(file_path, kind, media.id)
             if thumbnail_path:
                 media.thumbnail_path = thumbnail_path
                 db.commit()
@@ -395,12 +557,14 @@ async def upload_media(
             print(f"Failed to generate thumbnail for media {media.id}: {e}")
             # Don't fail the upload if thumbnail generation fails
         
+        _invalidate_list_cache()
+        
         # Get tags for response
         tags_response = [mt.tag.name for mt in media.media_tags]
         
         return MediaResponse(
             id=media.id,
-            kind=media.kind.value,
+            kind=media.kind,
             title=media.title,
             description=media.description,
             filename=media.filename,
@@ -410,9 +574,9 @@ async def upload_media(
             height=media.height,
             captured_at=media.captured_at,
             tape_number=media.tape_number,
-            source_kind=media.source.kind.value,
-            visibility=media.visibility.value,
-            status=media.status.value,
+            source_kind=media.source.kind,
+            visibility=media.visibility,
+            status=media.status,
             created_at=media.created_at,
             tags=tags_response,
             comments_count=0,
@@ -420,6 +584,8 @@ async def upload_media(
         )
     except (ValueError, IntegrityError) as e:
         # Clean up file if media creation fails
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         if os.path.exists(file_path):
             os.remove(file_path)
         raise HTTPException(
@@ -429,7 +595,7 @@ async def upload_media(
 
 
 @router.post("/{media_id}/tags")
-async def add_tag_to_media(
+def add_tag_to_media(
     media_id: int,
     tag_name: str,
     db: Session = Depends(get_db),
@@ -440,6 +606,7 @@ async def add_tag_to_media(
     
     try:
         media_service.add_tag_to_media(media_id, tag_name, current_user.id)
+        _invalidate_list_cache()
         return {"message": "Tag added successfully"}
     except ValueError as e:
         raise HTTPException(
@@ -449,7 +616,7 @@ async def add_tag_to_media(
 
 
 @router.delete("/{media_id}/tags/{tag_id}")
-async def remove_tag_from_media(
+def remove_tag_from_media(
     media_id: int,
     tag_id: int,
     db: Session = Depends(get_db),
@@ -460,6 +627,7 @@ async def remove_tag_from_media(
     
     try:
         media_service.remove_tag_from_media(media_id, tag_id, current_user.id)
+        _invalidate_list_cache()
         return {"message": "Tag removed successfully"}
     except ValueError as e:
         raise HTTPException(
@@ -469,7 +637,7 @@ async def remove_tag_from_media(
 
 
 @router.post("/{media_id}/comments", response_model=CommentResponse)
-async def add_comment_to_media(
+def add_comment_to_media(
     media_id: int,
     comment_data: CommentCreate,
     db: Session = Depends(get_db),
@@ -480,6 +648,7 @@ async def add_comment_to_media(
     
     try:
         comment = media_service.add_comment_to_media(media_id, comment_data.body, current_user.id)
+        _invalidate_list_cache()
         return CommentResponse(
             id=comment.id,
             body=comment.body,
@@ -495,7 +664,7 @@ async def add_comment_to_media(
 
 
 @router.get("/{media_id}/comments", response_model=List[CommentResponse])
-async def get_media_comments(
+def get_media_comments(
     media_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -518,7 +687,7 @@ async def get_media_comments(
 
 
 @router.get("/{media_id}/stream")
-async def stream_media(
+def stream_media(
     media_id: int,
     request: Request,
     db: Session = Depends(get_db),
@@ -533,7 +702,7 @@ async def stream_media(
         )
     
     # Check permissions
-    if media.visibility == "PRIVATE" and media.uploaded_by != current_user.id and current_user.role != "ADMIN":
+    if media.visibility == "PRIVATE" and media.uploaded_by != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this media"
@@ -553,20 +722,13 @@ async def stream_media(
     file_size = os.path.getsize(file_path)
     
     # Determine content type
-    content_type, _ = mimetypes.guess_type(file_path)
-    if not content_type:
-        content_type = "application/octet-stream"
+    content_type = _guess_mime(os.path.splitext(file_path)[1].lower())
     
     # Handle range requests for video streaming
     range_header = request.headers.get('range')
-    if range_header:
-        # Parse range header (e.g., "bytes=0-1023")
-        range_match = range_header.replace('bytes=', '').split('-')
-        start = int(range_match[0]) if range_match[0] else 0
-        end = int(range_match[1]) if range_match[1] else file_size - 1
-        
-        # Ensure end doesn't exceed file size
-        end = min(end, file_size - 1)
+    byte_range = _parse_range(range_header, file_size) if range_header else None
+    if byte_range:
+        start, end = byte_range
         content_length = end - start + 1
         
         # Read the requested range
@@ -575,7 +737,7 @@ async def stream_media(
                 f.seek(start)
                 remaining = content_length
                 while remaining:
-                    chunk_size = min(8192, remaining)  # 8KB chunks
+                    chunk_size = min(_STREAM_CHUNK_SIZE, remaining)
                     chunk = f.read(chunk_size)
                     if not chunk:
                         break
@@ -596,31 +758,16 @@ async def stream_media(
             media_type=content_type
         )
     else:
-        # No range request - stream entire file
-        def iterfile():
-            with open(file_path, 'rb') as f:
-                while True:
-                    chunk = f.read(8192)  # 8KB chunks
-                    if not chunk:
-                        break
-                    yield chunk
-        
-        headers = {
-            'Accept-Ranges': 'bytes',
-            'Content-Length': str(file_size),
-            'Content-Type': content_type,
-        }
-        
-        return StreamingResponse(
-            iterfile(),
-            status_code=200,
-            headers=headers,
-            media_type=content_type
+        # No range request - let FileResponse stream the entire file
+        return FileResponse(
+            path=file_path,
+            media_type=content_type,
+            headers={'Accept-Ranges': 'bytes'}
         )
 
 
 @router.get("/{media_id}/download")
-async def download_media(
+def download_media(
     media_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -634,7 +781,7 @@ async def download_media(
         )
     
     # Check permissions
-    if media.visibility == "PRIVATE" and media.uploaded_by != current_user.id and current_user.role != "ADMIN":
+    if media.visibility == "PRIVATE" and media.uploaded_by != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to download this media"
@@ -652,12 +799,13 @@ async def download_media(
     
     return FileResponse(
         path=file_path,
+        media_type=_guess_mime(os.path.splitext(file_path)[1].lower()),
         filename=media.filename
     )
 
 
 @router.get("/{media_id}/thumbnail")
-async def get_media_thumbnail(
+def get_media_thumbnail(
     media_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -671,14 +819,19 @@ async def get_media_thumbnail(
         )
     
     # Check permissions - only owner or admin can view
-    if media.uploaded_by != current_user.id and current_user.role != "ADMIN":
+    if media.uploaded_by != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this media"
         )
     
-    # Check if thumbnail exists
-    if not media.thumbnail_path or not os.path.exists(media.thumbnail_path):
+    # Check if thumbnail exists; the stat is handed to FileResponse so it
+    # doesn't stat the file a second time before sending it
+    try:
+        thumbnail_stat = os.stat(media.thumbnail_path) if media.thumbnail_path else None
+    except OSError:
+        thumbnail_stat = None
+    if thumbnail_stat is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Thumbnail not found"
@@ -687,18 +840,23 @@ async def get_media_thumbnail(
     return FileResponse(
         path=media.thumbnail_path,
         media_type="image/jpeg",
-        filename=f"thumb_{media_id}.jpg"
+        filename=f"thumb_{media_id}.jpg",
+        stat_result=thumbnail_stat
     )
 
 
 @router.delete("/{media_id}")
-async def delete_media(
+def delete_media(
     media_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete media (soft delete)"""
-    media = db.query(Media).filter(Media.id == media_id, Media.deleted_at.is_(None)).first()
+    # Only the columns needed for the permission check and thumbnail cleanup
+    media = db.query(Media.uploaded_by, Media.thumbnail_path).filter(
+        Media.id == media_id,
+        Media.deleted_at.is_(None)
+    ).first()
     if not media:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -706,7 +864,7 @@ async def delete_media(
         )
     
     # Check permissions - only owner or admin can delete
-    if media.uploaded_by != current_user.id and current_user.role != "ADMIN":
+    if media.uploaded_by != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this media"
@@ -721,9 +879,14 @@ async def delete_media(
             print(f"Failed to delete thumbnail {media.thumbnail_path}: {e}")
     
     # Soft delete
-    from datetime import datetime
-    media.deleted_at = datetime.utcnow()
+    db.execute(
+        update(Media)
+        .where(Media.id == media_id, Media.deleted_at.is_(None))
+        .values(deleted_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
+    _invalidate_list_cache()
     
     return {"message": "Media deleted successfully"}
 
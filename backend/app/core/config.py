@@ -6,21 +6,40 @@ import os
 class Settings(BaseSettings):
     # Database
     database_url: str = "mysql+pymysql://root@localhost:3306/video_mgmt_db"
+    db_pool_size: int = 25
+    db_max_overflow: int = 25
+    db_pool_recycle: int = 1800
     
     # Security
     secret_key: str = "your-secret-key-here"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
+    # Cost for new password hashes; existing hashes keep the cost they were made with
+    bcrypt_rounds: int = 10
     
     # Media Storage
     media_storage_path: str = "/volume1/media"
     max_file_size_mb: int = 2048
     
+    # FFmpeg hardware device for video thumbnail decoding (e.g. "vaapi", "cuda"); empty uses the CPU
+    video_hwaccel: str = ""
+    
     # Features
     enable_user_uploads: bool = False
     enable_guest_view: bool = False
     
+    # Raise instead of lazy-loading unplanned relationships on list queries
+    strict_orm_loading: bool = True
+    
+    # Seconds a rendered first page of the media list may be served from the
+    # in-process cache; each worker has its own cache, so this bounds how long
+    # other workers can serve a list that predates a write
+    media_list_cache_ttl: int = 30
+    
+    # Skip the OpenAPI schema and docs pages (saves building them in production)
+    disable_openapi: bool = False
+    
     # Admin
     admin_email: str = "admin@example.com"
     admin_password: str = "admin123"
@@ -6,7 +6,10 @@ from .api import auth, media, admin
 app = FastAPI(
     title="Video Management API",
     description="A web-based gallery for family & friends to view photos/videos",
-    version="1.0.0"
+    version="1.0.0",
+    openapi_url=None if settings.disable_openapi else "/openapi.json",
+    docs_url=None if settings.disable_openapi else "/docs",
+    redoc_url=None if settings.disable_openapi else "/redoc"
 )
 
 # CORS middleware
@@ -16,6 +19,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
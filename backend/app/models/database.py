@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, String, Text, DateTime, Integer, Enum, Boolean, JSON, ForeignKey, UniqueConstraint, Index
+from sqlalchemy import Column, BigInteger, String, Text, DateTime, Integer, Boolean, JSON, ForeignKey, UniqueConstraint, Index, Computed, CheckConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
@@ -64,20 +64,30 @@ class ImportStatus(str, enum.Enum):
     FAILED = "FAILED"
 
 
+def _one_of(column: str, enum_cls) -> str:
+    """CHECK condition limiting a string column to an enum's values"""
+    values = ", ".join(f"'{member.value}'" for member in enum_cls)
+    return f"{column} IN ({values})"
+
+
 class MediaSource(Base):
     __tablename__ = "media_sources"
     
     id = Column(Integer, primary_key=True, index=True)
-    kind = Column(Enum(MediaSourceKind), unique=True, nullable=False)
+    kind = Column(String(16), unique=True, nullable=False)
     name = Column(String(120), nullable=False)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        CheckConstraint(_one_of("kind", MediaSourceKind), name="ck_media_sources_kind"),
+    )
 
 
 class User(Base):
     __tablename__ = "users"
     
     id = Column(Integer, primary_key=True, index=True)
-    role = Column(Enum(UserRole), nullable=False, default=UserRole.USER)
+    role = Column(String(16), nullable=False, default=UserRole.USER.value)
     email = Column(String(255), unique=True, nullable=False, index=True)
     phone = Column(String(32), nullable=True)
     name = Column(String(120), nullable=False)
@@ -94,6 +104,10 @@ class User(Base):
     media_tags = relationship("MediaTag", back_populates="user")
     notifications = relationship("Notification", back_populates="recipient_user")
     audit_logs = relationship("AuditLog", back_populates="actor_user")
+    
+    __table_args__ = (
+        CheckConstraint(_one_of("role", UserRole), name="ck_users_role"),
+    )
 
 
 class Session(Base):
@@ -102,6 +116,7 @@ class Session(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     refresh_token_hash = Column(String(64), unique=True, nullable=False, index=True)
+    refresh_token_lookup = Column(String(64), unique=True, nullable=True, index=True)
     user_agent = Column(String(255), nullable=True)
     ip = Column(String(45), nullable=True)  # IPv6 compatible
     created_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -110,13 +125,18 @@ class Session(Base):
     
     # Relationships
     user = relationship("User", back_populates="sessions")
+    
+    # Indexes
+    __table_args__ = (
+        Index("idx_sessions_live", "revoked_at", "expires_at"),
+    )
 
 
 class Media(Base):
     __tablename__ = "media"
     
     id = Column(Integer, primary_key=True, index=True)
-    kind = Column(Enum(MediaKind), nullable=False)
+    kind = Column(String(16), nullable=False)
     title = Column(String(255), nullable=True)
     description = Column(Text, nullable=True)
     storage_path = Column(String(1024), nullable=False)
@@ -125,6 +145,7 @@ class Media(Base):
     ext = Column(String(16), nullable=False)
     byte_size = Column(BigInteger, nullable=False)
     content_hash = Column(String(64), unique=True, nullable=False, index=True)
+    content_hash_prefix = Column(String(16), nullable=True, index=True)  # SHA-256 of the first MiB, truncated
     duration_sec = Column(Integer, nullable=True)
     width = Column(Integer, nullable=True)
     height = Column(Integer, nullable=True)
@@ -132,15 +153,20 @@ class Media(Base):
     uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     source_id = Column(Integer, ForeignKey("media_sources.id"), nullable=False)
     tape_number = Column(String(32), nullable=True, index=True)
+    # tape_number while the row is live, NULL once soft-deleted; MySQL has no
+    # partial indexes, so uniqueness of active tape numbers is enforced on this
+    live_tape_number = Column(String(32), Computed("CASE WHEN deleted_at IS NULL THEN tape_number END"), nullable=True)
     source_ref = Column(String(255), nullable=True)
-    visibility = Column(Enum(Visibility), nullable=False, default=Visibility.AUTHED)
-    status = Column(Enum(Status), nullable=False, default=Status.READY, index=True)
+    visibility = Column(String(16), nullable=False, default=Visibility.AUTHED.value)
+    status = Column(String(16), nullable=False, default=Status.READY.value, index=True)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
     deleted_at = Column(DateTime, nullable=True, index=True)
     
     # Relationships
+    # Everything loads lazily; queries whose responses need source join it in
+    # with joinedload(Media.source)
     uploader = relationship("User", back_populates="uploaded_media")
     source = relationship("MediaSource")
     comments = relationship("Comment", back_populates="media", cascade="all, delete-orphan")
@@ -151,10 +177,15 @@ class Media(Base):
     # Indexes
     __table_args__ = (
         Index("idx_media_source", "source_id"),
-        Index("idx_media_captured_at", "captured_at"),
+        # Serves the list's deleted_at IS NULL filter and newest-first order as one range scan
+        Index("idx_media_active_captured", deleted_at, captured_at.desc(), id.desc()),
         Index("idx_media_status", "status"),
         Index("idx_media_deleted_at", "deleted_at"),
         Index("idx_media_tape_number", "tape_number"),
+        Index("uq_media_tape_active", "source_id", "live_tape_number", unique=True),
+        CheckConstraint(_one_of("kind", MediaKind), name="ck_media_kind"),
+        CheckConstraint(_one_of("visibility", Visibility), name="ck_media_visibility"),
+        CheckConstraint(_one_of("status", Status), name="ck_media_status"),
     )
 
 
@@ -201,19 +232,24 @@ class MediaAsset(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     media_id = Column(Integer, ForeignKey("media.id", ondelete="CASCADE"), nullable=False)
-    asset_type = Column(Enum(AssetType), nullable=False)
+    asset_type = Column(String(16), nullable=False)
     storage_path = Column(String(1024), nullable=False)
     mime_type = Column(String(127), nullable=False)
     width = Column(Integer, nullable=True)
     height = Column(Integer, nullable=True)
     duration_sec = Column(Integer, nullable=True)
     quality_label = Column(String(32), nullable=True)
-    status = Column(Enum(Status), nullable=False, default=Status.READY)
+    status = Column(String(16), nullable=False, default=Status.READY.value)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
     
     # Relationships
     media = relationship("Media", back_populates="media_assets")
+    
+    __table_args__ = (
+        CheckConstraint(_one_of("asset_type", AssetType), name="ck_media_assets_asset_type"),
+        CheckConstraint(_one_of("status", Status), name="ck_media_assets_status"),
+    )
 
 
 class Notification(Base):
@@ -221,32 +257,42 @@ class Notification(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     recipient_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    event_type = Column(Enum(NotificationEventType), nullable=False)
+    event_type = Column(String(16), nullable=False)
     payload_json = Column(JSON, nullable=False)
-    status = Column(Enum(NotificationStatus), nullable=False, default=NotificationStatus.PENDING)
+    status = Column(String(16), nullable=False, default=NotificationStatus.PENDING.value)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     sent_at = Column(DateTime, nullable=True)
     error_msg = Column(String(255), nullable=True)
     
     # Relationships
     recipient_user = relationship("User", back_populates="notifications")
+    
+    __table_args__ = (
+        CheckConstraint(_one_of("event_type", NotificationEventType), name="ck_notifications_event_type"),
+        CheckConstraint(_one_of("status", NotificationStatus), name="ck_notifications_status"),
+    )
 
 
 class Import(Base):
     __tablename__ = "imports"
     
     id = Column(Integer, primary_key=True, index=True)
-    source = Column(Enum(MediaSourceKind), nullable=False)
+    source = Column(String(16), nullable=False)
     external_id = Column(String(255), nullable=True)
     media_id = Column(Integer, ForeignKey("media.id"), nullable=True)
     run_id = Column(String(64), nullable=False, index=True)
-    status = Column(Enum(ImportStatus), nullable=False)
+    status = Column(String(16), nullable=False)
     message = Column(String(255), nullable=True)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
     
     # Relationships
     media = relationship("Media", back_populates="imports")
+    
+    __table_args__ = (
+        CheckConstraint(_one_of("source", MediaSourceKind), name="ck_imports_source"),
+        CheckConstraint(_one_of("status", ImportStatus), name="ck_imports_status"),
+    )
 
 
 class AuditLog(Base):
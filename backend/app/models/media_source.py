@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from pydantic import BaseModel
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional
+from pydantic import BaseModel, ConfigDict, field_validator
 
 
 class MediaDTO(BaseModel):
     """Data Transfer Object for media operations"""
+    model_config = ConfigDict(str_strip_whitespace=True, defer_build=True)
+    
     kind: str  # PHOTO, VIDEO
     title: Optional[str] = None
     description: Optional[str] = None
@@ -13,11 +16,20 @@ class MediaDTO(BaseModel):
     source_kind: str
     tape_number: Optional[str] = None
     source_ref: Optional[str] = None
+    
+    @field_validator("tags", mode="after")
+    @classmethod
+    def normalize_tags(cls, v: list[str]) -> list[str]:
+        # Items are already stripped by str_strip_whitespace
+        return [tag.lower() for tag in v if tag]
 
 
 class MediaSource(ABC):
     """Abstract base class for media sources with validation"""
     
+    # DTO fields where an empty string means "not given"
+    optional_text_fields = ("tape_number", "title", "description")
+    
     def __init__(self, kind: str):
         self.kind = kind
     
@@ -27,26 +39,11 @@ class MediaSource(ABC):
         pass
     
     def normalize(self, media_dto: MediaDTO) -> MediaDTO:
-        """Normalize media DTO (e.g., trim strings, convert empty to None)"""
-        if media_dto.tape_number:
-            media_dto.tape_number = media_dto.tape_number.strip()
-            if not media_dto.tape_number:
-                media_dto.tape_number = None
-        elif media_dto.tape_number == "":
-            media_dto.tape_number = None
-        
-        if media_dto.title:
-            media_dto.title = media_dto.title.strip()
-            if not media_dto.title:
-                media_dto.title = None
-                
-        if media_dto.description:
-            media_dto.description = media_dto.description.strip()
-            if not media_dto.description:
-                media_dto.description = None
-        
-        # Normalize tags
-        media_dto.tags = [tag.strip().lower() for tag in media_dto.tags if tag.strip()]
+        """Normalize media DTO (convert empty strings to None)"""
+        # Strings are stripped and tags lowercased when the DTO is validated
+        for field in self.optional_text_fields:
+            if getattr(media_dto, field) == "":
+                setattr(media_dto, field, None)
         
         return media_dto
     
@@ -71,16 +68,25 @@ class VideoTapeSource(MediaSource):
             raise ValueError("tape_number must be 32 characters or less")
 
 
-class ICloudSource(MediaSource):
-    """iCloud source - forbids tape_number"""
+class _ForbidsTapeNumberSource(MediaSource):
+    """Base for sources that forbid tape_number"""
     
-    def __init__(self):
-        super().__init__("ICLOUD")
+    # Source name used in validation errors
+    label: str
     
     def validate(self, media_dto: MediaDTO) -> None:
-        """iCloud source forbids tape_number"""
+        """Reject any tape_number"""
         if media_dto.tape_number:
-            raise ValueError("iCloud source cannot have tape_number")
+            raise ValueError(f"{self.label} source cannot have tape_number")
+
+
+class ICloudSource(_ForbidsTapeNumberSource):
+    """iCloud source - forbids tape_number"""
+    
+    label = "iCloud"
+    
+    def __init__(self):
+        super().__init__("ICLOUD")
     
     def hydrate(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Hydrate with iCloud-specific metadata"""
@@ -88,75 +94,65 @@ class ICloudSource(MediaSource):
         return metadata
 
 
-class GooglePhotosSource(MediaSource):
+class GooglePhotosSource(_ForbidsTapeNumberSource):
     """Google Photos source - forbids tape_number"""
     
+    label = "Google Photos"
+    
     def __init__(self):
         super().__init__("GOOGLE_PHOTOS")
     
-    def validate(self, media_dto: MediaDTO) -> None:
-        """Google Photos source forbids tape_number"""
-        if media_dto.tape_number:
-            raise ValueError("Google Photos source cannot have tape_number")
-    
     def hydrate(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Hydrate with Google Photos-specific metadata"""
         return metadata
 
 
-class GoogleDriveSource(MediaSource):
+class GoogleDriveSource(_ForbidsTapeNumberSource):
     """Google Drive source - forbids tape_number"""
     
+    label = "Google Drive"
+    
     def __init__(self):
         super().__init__("GOOGLE_DRIVE")
     
-    def validate(self, media_dto: MediaDTO) -> None:
-        """Google Drive source forbids tape_number"""
-        if media_dto.tape_number:
-            raise ValueError("Google Drive source cannot have tape_number")
-    
     def hydrate(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Hydrate with Google Drive-specific metadata"""
         return metadata
 
 
-class GuestUploadSource(MediaSource):
+class GuestUploadSource(_ForbidsTapeNumberSource):
     """Guest Upload source - forbids tape_number"""
     
+    label = "Guest Upload"
+    
     def __init__(self):
         super().__init__("GUEST_UPLOAD")
-    
-    def validate(self, media_dto: MediaDTO) -> None:
-        """Guest Upload source forbids tape_number"""
-        if media_dto.tape_number:
-            raise ValueError("Guest Upload source cannot have tape_number")
 
 
-class UserUploadSource(MediaSource):
+class UserUploadSource(_ForbidsTapeNumberSource):
     """User Upload source - forbids tape_number"""
     
+    label = "User Upload"
+    
     def __init__(self):
         super().__init__("USER_UPLOAD")
-    
-    def validate(self, media_dto: MediaDTO) -> None:
-        """User Upload source forbids tape_number"""
-        if media_dto.tape_number:
-            raise ValueError("User Upload source cannot have tape_number")
 
 
-# Factory function to get the appropriate source validator
+# Sources are stateless, so one shared instance per kind
+_SOURCES: Mapping[str, MediaSource] = MappingProxyType({
+    "VIDEOTAPE": VideoTapeSource(),
+    "ICLOUD": ICloudSource(),
+    "GOOGLE_PHOTOS": GooglePhotosSource(),
+    "GOOGLE_DRIVE": GoogleDriveSource(),
+    "GUEST_UPLOAD": GuestUploadSource(),
+    "USER_UPLOAD": UserUploadSource(),
+})
+
+
 def get_media_source(kind: str) -> MediaSource:
-    """Factory function to get the appropriate MediaSource instance"""
-    sources = {
-        "VIDEOTAPE": VideoTapeSource,
-        "ICLOUD": ICloudSource,
-        "GOOGLE_PHOTOS": GooglePhotosSource,
-        "GOOGLE_DRIVE": GoogleDriveSource,
-        "GUEST_UPLOAD": GuestUploadSource,
-        "USER_UPLOAD": UserUploadSource,
-    }
-    
-    if kind not in sources:
+    """Get the shared MediaSource instance for a source kind"""
+    source = _SOURCES.get(kind)
+    if source is None:
         raise ValueError(f"Unknown media source kind: {kind}")
     
-    return sources[kind]()
+    return source
@@ -1,9 +1,31 @@
 from sqlalchemy.orm import Session
 from typing import Optional
-from passlib.context import CryptContext
+import bcrypt
+from ..core.config import settings
 from ..models.database import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt only looks at the first 72 bytes of a password
+_BCRYPT_MAX_BYTES = 72
+
+# Checked against when the user doesn't exist, so unknown emails take as long
+# as wrong passwords
+_DUMMY_HASH = bcrypt.hashpw(b"dummy-password", bcrypt.gensalt(rounds=settings.bcrypt_rounds))
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Check a password against a stored bcrypt hash"""
+    return bcrypt.checkpw(plain_password.encode()[:_BCRYPT_MAX_BYTES], hashed_password.encode())
+
+
+def get_password_hash(password: str) -> str:
+    """Hash a password with bcrypt at the configured cost"""
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+    return bcrypt.hashpw(password.encode()[:_BCRYPT_MAX_BYTES], salt).decode()
+
+
+def dummy_verify_password(plain_password: str) -> None:
+    """Spend the same time as a real verify without a real hash"""
+    bcrypt.checkpw(plain_password.encode()[:_BCRYPT_MAX_BYTES], _DUMMY_HASH)
 
 
 class AuthService:
@@ -11,10 +33,10 @@ class AuthService:
         self.db = db
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+        return verify_password(plain_password, hashed_password)
     
     def get_password_hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+        return get_password_hash(password)
     
     def get_user_by_email(self, email: str) -> Optional[User]:
         return self.db.query(User).filter(
@@ -25,6 +47,7 @@ class AuthService:
     def authenticate_user(self, email: str, password: str) -> Optional[User]:
         user = self.get_user_by_email(email)
         if not user:
+            dummy_verify_password(password)
             return None
         if not self.verify_password(password, user.password_hash):
             return None
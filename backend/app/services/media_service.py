@@ -1,18 +1,51 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload, load_only, raiseload, selectinload
+from sqlalchemy import and_, or_, func, lambda_stmt, select
+from sqlalchemy.exc import IntegrityError
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
 from datetime import datetime
 import hashlib
 import os
 
+from ..core.config import settings
 from ..models.database import Media, MediaSource as MediaSourceModel, Tag, MediaTag, Comment
 from ..models.media_source import MediaDTO, get_media_source
 
 
+# Columns the media list response shows; storage paths, hashes and notes stay
+# on the detail query
+_LIST_COLUMNS = (
+    Media.id, Media.kind, Media.title, Media.description, Media.filename,
+    Media.byte_size, Media.duration_sec, Media.width, Media.height,
+    Media.captured_at, Media.tape_number, Media.source_id, Media.visibility,
+    Media.status, Media.created_at, Media.thumbnail_path,
+)
+
+
 class MediaService:
+    # media_sources is fixed seed data, so {kind -> id} is loaded once per process
+    _source_id_cache: Dict[str, int] = {}
+    
     def __init__(self, db: Session):
         self.db = db
     
+    @classmethod
+    def invalidate_source_cache(cls):
+        """Drop the cached source IDs after media_sources is modified"""
+        cls._source_id_cache = {}
+    
+    def _get_source_id(self, kind: str) -> Optional[int]:
+        """Look up a source ID by kind, loading the cache on a miss"""
+        cls = type(self)
+        source_id = cls._source_id_cache.get(kind)
+        if source_id is None:
+            cls._source_id_cache = {
+                source_kind: source_id
+                for source_kind, source_id in self.db.query(MediaSourceModel.kind, MediaSourceModel.id).all()
+            }
+            source_id = cls._source_id_cache.get(kind)
+        return source_id
+    
     def get_media(
         self,
         date_from: Optional[datetime] = None,
@@ -21,34 +54,103 @@ class MediaService:
         source: Optional[str] = None,
         tape_number: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[Tuple[Optional[datetime], int]] = None
     ) -> List[Media]:
-        """Get media with filters"""
-        query = self.db.query(Media).filter(Media.deleted_at.is_(None))
+        """
+        Get media with filters, ordered by captured_at then id, newest first
+        
+        cursor is the (captured_at, id) of the last item of the previous page;
+        items without captured_at sort after all dated ones.
+        """
+        # Built as a lambda statement so SQLAlchemy caches the construction and
+        # compiled SQL per filter combination; only the bound values change
+        stmt = lambda_stmt(lambda: select(Media).where(Media.deleted_at.is_(None)))
+        
+        # Fail loudly if a caller touches a column or relationship that wasn't
+        # loaded, instead of silently issuing one query per row
+        if settings.strict_orm_loading:
+            stmt += lambda s: s.options(
+                load_only(*_LIST_COLUMNS, raiseload=True),
+                joinedload(Media.source),
+                raiseload("*")
+            )
+        else:
+            stmt += lambda s: s.options(load_only(*_LIST_COLUMNS), joinedload(Media.source))
         
         # Date filters
         if date_from:
-            query = query.filter(Media.captured_at >= date_from)
+            stmt += lambda s: s.where(Media.captured_at >= date_from)
         if date_to:
-            query = query.filter(Media.captured_at <= date_to)
+            stmt += lambda s: s.where(Media.captured_at <= date_to)
         
         # Source filter
         if source:
-            query = query.join(MediaSourceModel).filter(MediaSourceModel.kind == source)
+            stmt += lambda s: s.join(MediaSourceModel).where(MediaSourceModel.kind == source)
         
         # Tape number filter (only for VideoTape source)
         if tape_number:
-            query = query.filter(Media.tape_number == tape_number)
+            stmt += lambda s: s.where(Media.tape_number == tape_number)
         
         # Tag filter
         if tag_ids:
-            query = query.join(MediaTag).filter(MediaTag.tag_id.in_(tag_ids))
+            stmt += lambda s: s.join(MediaTag).where(MediaTag.tag_id.in_(tag_ids))
+        
+        # Keyset pagination: seek past the cursor on idx_media_active_captured
+        # instead of having the database scan and discard `skip` rows
+        if cursor:
+            cursor_captured_at, cursor_id = cursor
+            if cursor_captured_at is None:
+                stmt += lambda s: s.where(Media.captured_at.is_(None), Media.id < cursor_id)
+            else:
+                stmt += lambda s: s.where(or_(
+                    Media.captured_at < cursor_captured_at,
+                    and_(Media.captured_at == cursor_captured_at, Media.id < cursor_id),
+                    Media.captured_at.is_(None)
+                ))
         
-        return query.offset(skip).limit(limit).all()
+        # MySQL sorts NULL lowest, so undated items come last in DESC order
+        stmt += lambda s: s.order_by(Media.captured_at.desc(), Media.id.desc()).offset(skip).limit(limit)
+        
+        return self.db.execute(stmt).scalars().all()
+    
+    def get_tag_names(self, media_ids: List[int]) -> Dict[int, List[str]]:
+        """Get tag names keyed by media ID"""
+        tags_by_media: Dict[int, List[str]] = defaultdict(list)
+        if not media_ids:
+            return tags_by_media
+        
+        rows = self.db.query(MediaTag.media_id, Tag.name).join(
+            Tag, MediaTag.tag_id == Tag.id
+        ).filter(MediaTag.media_id.in_(media_ids)).all()
+        for media_id, tag_name in rows:
+            tags_by_media[media_id].append(tag_name)
+        return tags_by_media
+    
+    def get_comment_counts(self, media_ids: List[int]) -> Dict[int, int]:
+        """Get active comment counts keyed by media ID"""
+        if not media_ids:
+            return {}
+        
+        rows = self.db.query(Comment.media_id, func.count(Comment.id)).filter(
+            Comment.media_id.in_(media_ids),
+            Comment.deleted_at.is_(None)
+        ).group_by(Comment.media_id).all()
+        return dict(rows)
+    
+    def get_comments_count(self, media_id: int) -> int:
+        """Count active comments on a media item"""
+        return self.db.query(func.count(Comment.id)).filter(
+            Comment.media_id == media_id,
+            Comment.deleted_at.is_(None)
+        ).scalar()
     
     def get_media_by_id(self, media_id: int) -> Optional[Media]:
         """Get media by ID"""
-        return self.db.query(Media).filter(
+        return self.db.query(Media).options(
+            selectinload(Media.media_tags).selectinload(MediaTag.tag),
+            joinedload(Media.source)
+        ).filter(
             Media.id == media_id,
             Media.deleted_at.is_(None)
         ).first()
@@ -64,28 +166,14 @@ class MediaService:
         # Validate according to source rules
         source_validator.validate(media_dto)
         
-        # Get source from database
-        source = self.db.query(MediaSourceModel).filter(
-            MediaSourceModel.kind == media_dto.source_kind
-        ).first()
-        
-        if not source:
+        source_id = self._get_source_id(media_dto.source_kind)
+        if source_id is None:
             raise ValueError(f"Unknown source kind: {media_dto.source_kind}")
         
         # Use provided content_hash or generate placeholder for non-upload sources
         if content_hash is None:
             content_hash = hashlib.sha256(f"{media_dto.source_kind}_{media_dto.source_ref}".encode()).hexdigest()
         
-        # Check for duplicate tape_number if VideoTape (check this first)
-        if media_dto.source_kind == "VIDEOTAPE" and media_dto.tape_number:
-            existing = self.db.query(Media).join(MediaSourceModel).filter(
-                MediaSourceModel.kind == "VIDEOTAPE",
-                Media.tape_number == media_dto.tape_number,
-                Media.deleted_at.is_(None)
-            ).first()
-            if existing:
-                raise ValueError(f"Tape number {media_dto.tape_number} already exists")
-        
         # Check for duplicate content_hash
         existing_hash = self.db.query(Media).filter(
             Media.content_hash == content_hash,
@@ -106,13 +194,20 @@ class MediaService:
             content_hash=content_hash,
             captured_at=datetime.fromisoformat(media_dto.captured_at) if media_dto.captured_at else None,
             uploaded_by=uploaded_by,
-            source_id=source.id,
+            source_id=source_id,
             tape_number=media_dto.tape_number,
             source_ref=media_dto.source_ref
         )
         
         self.db.add(media)
-        self.db.flush()  # Get the ID
+        try:
+            self.db.flush()  # Get the ID
+        except IntegrityError as e:
+            # Duplicate active tape numbers are rejected by uq_media_tape_active
+            self.db.rollback()
+            if "uq_media_tape_active" in str(e.orig) or "live_tape_number" in str(e.orig):
+                raise ValueError(f"Tape number {media_dto.tape_number} already exists")
+            raise
         
         # Create tags
         if media_dto.tags:
@@ -125,21 +220,23 @@ class MediaService:
     
     def _create_tags_for_media(self, media_id: int, tag_names: List[str], created_by: int):
         """Create tags and associate them with media"""
-        for tag_name in tag_names:
-            # Get or create tag
-            tag = self.db.query(Tag).filter(Tag.name == tag_name.lower()).first()
-            if not tag:
-                tag = Tag(name=tag_name.lower())
-                self.db.add(tag)
-                self.db.flush()
-            
-            # Create media-tag association
-            media_tag = MediaTag(
-                media_id=media_id,
-                tag_id=tag.id,
-                created_by=created_by
-            )
-            self.db.add(media_tag)
+        # Unique lowercase names, in first-seen order
+        names = list(dict.fromkeys(tag_name.lower() for tag_name in tag_names))
+        
+        # Get existing tags in one query and create the missing ones together
+        tags = {tag.name: tag for tag in self.db.query(Tag).filter(Tag.name.in_(names)).all()}
+        missing = [Tag(name=name) for name in names if name not in tags]
+        if missing:
+            self.db.add_all(missing)
+            self.db.flush()
+            tags.update((tag.name, tag) for tag in missing)
+        
+        # Create media-tag associations with one executemany INSERT, skipping
+        # the unit of work since nothing needs the ORM objects
+        self.db.execute(MediaTag.__table__.insert(), [
+            {"media_id": media_id, "tag_id": tags[name].id, "created_by": created_by}
+            for name in names
+        ])
     
     def add_tag_to_media(self, media_id: int, tag_name: str, created_by: int):
         """Add a tag to media"""
@@ -186,9 +283,9 @@ class MediaService:
         # Check permissions (simplified - in real app, check user role)
         if media_tag.created_by != user_id:
             # Check if user is admin
-            from ..models.database import User
+            from ..models.database import User, UserRole
             user = self.db.query(User).filter(User.id == user_id).first()
-            if not user or user.role != "ADMIN":
+            if not user or user.role != UserRole.ADMIN:
                 raise ValueError("Not authorized to remove this tag")
         
         self.db.delete(media_tag)
@@ -214,7 +311,9 @@ class MediaService:
     
     def get_media_comments(self, media_id: int) -> List[Comment]:
         """Get comments for media"""
-        return self.db.query(Comment).filter(
+        return self.db.query(Comment).options(
+            joinedload(Comment.user)
+        ).filter(
             Comment.media_id == media_id,
             Comment.deleted_at.is_(None)
         ).order_by(Comment.created_at.desc()).all()
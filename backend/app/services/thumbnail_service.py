@@ -1,17 +1,84 @@
+import io
+import logging
 import os
-import cv2
-from PIL import Image
-from typing import Optional
-import tempfile
-import shutil
+import av
+from av.codec.hwaccel import HWAccel, hwdevices_available
+from PIL import Image, features
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import threading
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Hardware video decoder, resolved once; None decodes in software. Codecs the
+# device can't handle still fall back to software per file.
+_HWACCEL: Optional[HWAccel] = None
+if settings.video_hwaccel and settings.video_hwaccel in hwdevices_available():
+    _HWACCEL = HWAccel(device_type=settings.video_hwaccel, allow_software_fallback=True)
+
+# Batch workers leave this to the process that started them
+_setup_warnings_logged = False
+
+
+def _log_setup_warnings():
+    """Log, once per process, when thumbnails will be generated the slow way"""
+    global _setup_warnings_logged
+    if _setup_warnings_logged:
+        return
+    _setup_warnings_logged = True
+    
+    # Resizing and JPEG encoding are only fast with pillow-simd built against
+    # libjpeg-turbo; a stock build still works, just slower
+    if not features.check_feature('libjpeg_turbo'):
+        logger.warning("Pillow is not using libjpeg-turbo; thumbnail generation will be slower")
+    if settings.video_hwaccel and _HWACCEL is None:
+        logger.warning("hwaccel '%s' not available; decoding video thumbnails in software", settings.video_hwaccel)
+
+
+# Stream disposition flag ffmpeg sets on embedded cover art
+_ATTACHED_PIC = av.stream.Disposition.attached_pic
+
+# Open video containers each batch worker keeps for reuse
+_BATCH_OPEN_CACHE_SIZE = 8
+
+# Per-process services for batch workers, keyed by thumbnail directory, so
+# open containers survive from one item to the next
+_worker_services: Dict[str, "ThumbnailService"] = {}
+
+
+def _generate_in_worker(item: Tuple[str, str, int, str]) -> Optional[str]:
+    """Process pool entry point for ThumbnailService.generate_batch"""
+    global _setup_warnings_logged
+    _setup_warnings_logged = True
+    media_path, media_kind, media_id, thumbnail_dir = item
+    service = _worker_services.get(thumbnail_dir)
+    if service is None:
+        service = _worker_services[thumbnail_dir] = ThumbnailService(thumbnail_dir, open_cache_size=_BATCH_OPEN_CACHE_SIZE)
+    return service.generate_thumbnail(media_path, media_kind, media_id)
 
 
 class ThumbnailService:
     """Service for generating thumbnails from images and videos"""
     
-    def __init__(self, thumbnail_dir: str = "/tmp/thumbnails"):
+    def __init__(self, thumbnail_dir: str = "/tmp/thumbnails", open_cache_size: int = 0):
+        """
+        Args:
+            thumbnail_dir: Directory to write thumbnails to
+            open_cache_size: Number of recently used video containers to keep
+                open, so repeat thumbnails of a file skip the open and probe.
+                Off by default since uploads never repeat a path.
+        """
+        _log_setup_warnings()
         self.thumbnail_dir = thumbnail_dir
-        os.makedirs(thumbnail_dir, exist_ok=True)
+        if not os.path.isdir(thumbnail_dir):
+            os.makedirs(thumbnail_dir, exist_ok=True)
+        
+        self.open_cache_size = open_cache_size
+        self._open_cache: "OrderedDict[str, av.container.InputContainer]" = OrderedDict()
+        self._open_cache_lock = threading.Lock()
     
     def generate_thumbnail(self, media_path: str, media_kind: str, media_id: int) -> Optional[str]:
         """
@@ -36,27 +103,57 @@ class ThumbnailService:
             print(f"Error generating thumbnail for media {media_id}: {e}")
             return None
     
+    @classmethod
+    def generate_batch(
+        cls,
+        items: List[Tuple[str, str, int]],
+        thumbnail_dir: str = "/tmp/thumbnails",
+        max_workers: Optional[int] = None
+    ) -> List[Optional[str]]:
+        """
+        Generate thumbnails for many media files in parallel
+        
+        Decoding, resizing and encoding are CPU bound, so items are spread over
+        a process pool (one worker per core by default) rather than threads.
+        
+        Args:
+            items: (media_path, media_kind, media_id) tuples
+            thumbnail_dir: Directory to write thumbnails to
+            max_workers: Number of worker processes
+            
+        Returns:
+            Thumbnail path or None for each item, in the same order
+        """
+        if not items:
+            return []
+        
+        _log_setup_warnings()
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(
+                _generate_in_worker,
+                [(media_path, media_kind, media_id, thumbnail_dir) for media_path, media_kind, media_id in items]
+            ))
+    
     def _generate_image_thumbnail(self, image_path: str, media_id: int) -> Optional[str]:
         """Generate thumbnail for image files"""
         try:
             # Open image with PIL
             with Image.open(image_path) as img:
+                max_size = (300, 200)  # width, height
+                
+                # Let libjpeg decode at 1/2, 1/4 or 1/8 scale, down to the
+                # smallest size still at least as large as the thumbnail
+                if img.format == 'JPEG':
+                    img.draft('RGB', max_size)
+                
                 # Convert to RGB if necessary
                 if img.mode != 'RGB':
                     img = img.convert('RGB')
                 
                 # Calculate thumbnail size (maintain aspect ratio)
-                max_size = (300, 200)  # width, height
                 img.thumbnail(max_size, Image.Resampling.LANCZOS)
                 
-                # Generate thumbnail filename
-                thumbnail_filename = f"thumb_{media_id}.jpg"
-                thumbnail_path = os.path.join(self.thumbnail_dir, thumbnail_filename)
-                
-                # Save thumbnail
-                img.save(thumbnail_path, 'JPEG', quality=85)
-                
-                return thumbnail_path
+                return self._save_thumbnail(img, media_id)
         except Exception as e:
             print(f"Error generating image thumbnail: {e}")
             return None
@@ -64,51 +161,149 @@ class ThumbnailService:
     def _generate_video_thumbnail(self, video_path: str, media_id: int) -> Optional[str]:
         """Generate thumbnail for video files"""
         try:
-            # Open video with OpenCV
-            cap = cv2.VideoCapture(video_path)
-            
-            if not cap.isOpened():
-                print(f"Could not open video file: {video_path}")
-                return None
-            
-            # Get video properties
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
+            # Open video with PyAV (or reuse a cached container)
+            container, reused = self._checkout_video(video_path)
+            try:
+                # Cover art (MP4 covr, MKV attached pictures) is a ready-made
+                # still image; copying its one packet out needs no video decode
+                cover_data = self._read_cover_art(container, reused)
+                frame = None
+                if cover_data is None:
+                    stream = next(s for s in container.streams.video if not s.disposition & _ATTACHED_PIC)
+                    
+                    # Jump to the keyframe at or before 10% of the video; decoding
+                    # starts there, so only that one frame is decoded
+                    if stream.duration:
+                        target_pts = (stream.start_time or 0) + int(stream.duration * 0.1)
+                        container.seek(target_pts, backward=True, any_frame=False, stream=stream)
+                    elif container.duration:
+                        container.seek(int(container.duration * 0.1), backward=True, any_frame=False)
+                    elif reused:
+                        container.seek(0)
+                    
+                    frame = next(container.decode(stream), None)
+            except Exception:
+                container.close()
+                raise
+            self._checkin_video(video_path, container)
             
-            # Seek to 10% of the video (or frame 30, whichever is smaller)
-            seek_frame = min(int(total_frames * 0.1), 30)
-            cap.set(cv2.CAP_PROP_POS_FRAMES, seek_frame)
+            if cover_data is not None:
+                return self._generate_cover_thumbnail(cover_data, media_id)
             
-            # Read frame
-            ret, frame = cap.read()
-            cap.release()
-            
-            if not ret:
+            if frame is None:
                 print(f"Could not read frame from video: {video_path}")
                 return None
             
-            # Convert BGR to RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Convert to PIL Image
-            pil_image = Image.fromarray(frame_rgb)
-            
             # Calculate thumbnail size (maintain aspect ratio)
             max_size = (300, 200)  # width, height
-            pil_image.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            # Generate thumbnail filename
-            thumbnail_filename = f"thumb_{media_id}.jpg"
-            thumbnail_path = os.path.join(self.thumbnail_dir, thumbnail_filename)
+            scale = min(max_size[0] / frame.width, max_size[1] / frame.height, 1)
+            width = max(round(frame.width * scale), 1)
+            height = max(round(frame.height * scale), 1)
             
-            # Save thumbnail
-            pil_image.save(thumbnail_path, 'JPEG', quality=85)
+            # swscale downsizes and converts to RGB in one pass, so only the
+            # thumbnail-sized buffer is ever converted or handed to PIL
+            small_frame = frame.reformat(width=width, height=height, format='rgb24', interpolation='AREA')
+            pil_image = small_frame.to_image()
             
-            return thumbnail_path
+            return self._save_thumbnail(pil_image, media_id)
         except Exception as e:
             print(f"Error generating video thumbnail: {e}")
             return None
     
+    def _read_cover_art(self, container: av.container.InputContainer, reused: bool) -> Optional[bytes]:
+        """Return the encoded bytes of a video's embedded cover art, if it has any"""
+        cover = next((s for s in container.streams.video if s.disposition & _ATTACHED_PIC), None)
+        if cover is None:
+            return None
+        if reused:
+            # ffmpeg only re-queues the attached picture after a seek
+            container.seek(0)
+        packet = next(container.demux(cover), None)
+        if packet is None or not packet.size:
+            return None
+        return bytes(packet)
+    
+    def _generate_cover_thumbnail(self, image_data: bytes, media_id: int) -> Optional[str]:
+        """Generate thumbnail from a video's embedded cover art"""
+        with Image.open(io.BytesIO(image_data)) as img:
+            max_size = (300, 200)  # width, height
+            if img.format == 'JPEG':
+                img.draft('RGB', max_size)
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            img.thumbnail(max_size, Image.Resampling.LANCZOS)
+            return self._save_thumbnail(img, media_id)
+    
+    def _checkout_video(self, video_path: str) -> Tuple[av.container.InputContainer, bool]:
+        """Take a cached container for video_path, or open one; also says whether it was cached"""
+        with self._open_cache_lock:
+            container = self._open_cache.pop(video_path, None)
+        if container is not None:
+            return container, True
+        return self._open_video(video_path), False
+    
+    def _checkin_video(self, video_path: str, container: av.container.InputContainer) -> None:
+        """Return a container to the cache, closing whatever no longer fits"""
+        evicted = None
+        with self._open_cache_lock:
+            if self.open_cache_size <= 0 or video_path in self._open_cache:
+                evicted = container
+            else:
+                self._open_cache[video_path] = container
+                if len(self._open_cache) > self.open_cache_size:
+                    _, evicted = self._open_cache.popitem(last=False)
+        if evicted is not None:
+            evicted.close()
+    
+    def close(self) -> None:
+        """Close any cached video containers"""
+        with self._open_cache_lock:
+            containers = list(self._open_cache.values())
+            self._open_cache.clear()
+        for container in containers:
+            container.close()
+    
+    def _open_video(self, video_path: str) -> av.container.InputContainer:
+        """Open a video on the configured hardware decoder, falling back to software"""
+        global _HWACCEL
+        if _HWACCEL is None:
+            return av.open(video_path)
+        
+        try:
+            return av.open(video_path, hwaccel=_HWACCEL)
+        except av.FFmpegError as e:
+            # If the file opens fine without it, the device is the problem;
+            # stop trying it for the rest of the process
+            container = av.open(video_path)
+            logger.warning("hwaccel '%s' failed (%s); decoding video thumbnails in software", settings.video_hwaccel, e)
+            _HWACCEL = None
+            return container
+    
+    def _save_thumbnail(self, image: Image.Image, media_id: int) -> str:
+        """
+        Encode a thumbnail as JPEG and write it in place atomically
+        
+        The JPEG is built in memory and written with a single write() to a
+        temporary file that is then renamed, so readers never see a partial file.
+        """
+        # Pinned to the fast encoder path: baseline (not progressive), no
+        # optimize pass (a second Huffman pass, ~2x encode time for a few
+        # percent smaller files) and 4:2:0 chroma, which libjpeg-turbo's SIMD
+        # code handles fastest and is invisible at thumbnail size
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=85, optimize=False, progressive=False, subsampling=2)
+        
+        # Generate thumbnail filename
+        thumbnail_filename = f"thumb_{media_id}.jpg"
+        thumbnail_path = os.path.join(self.thumbnail_dir, thumbnail_filename)
+        
+        tmp_path = f"{thumbnail_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getbuffer())
+        os.replace(tmp_path, thumbnail_path)
+        
+        return thumbnail_path
+    
     def get_thumbnail_path(self, media_id: int) -> Optional[str]:
         """Get the path to an existing thumbnail"""
         thumbnail_filename = f"thumb_{media_id}.jpg"
@@ -6,38 +6,39 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from sqlalchemy.orm import sessionmaker
-from app.core.database import engine
+from sqlalchemy import insert
+
+from app.core.database import SessionLocal
 from app.models.database import *
 from app.core.config import settings
-from passlib.context import CryptContext
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.services.auth_service import get_password_hash
 
 def seed_database():
     """Seed the database with initial data"""
     
     # Create session
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     db = SessionLocal()
     
     try:
         # Create media sources
         media_sources = [
-            MediaSource(kind="VIDEOTAPE", name="Video Tapes"),
-            MediaSource(kind="ICLOUD", name="iCloud"),
-            MediaSource(kind="GOOGLE_PHOTOS", name="Google Photos"),
-            MediaSource(kind="GOOGLE_DRIVE", name="Google Drive"),
-            MediaSource(kind="GUEST_UPLOAD", name="Guest Uploads"),
-            MediaSource(kind="USER_UPLOAD", name="User Uploads"),
+            {"kind": "VIDEOTAPE", "name": "Video Tapes"},
+            {"kind": "ICLOUD", "name": "iCloud"},
+            {"kind": "GOOGLE_PHOTOS", "name": "Google Photos"},
+            {"kind": "GOOGLE_DRIVE", "name": "Google Drive"},
+            {"kind": "GUEST_UPLOAD", "name": "Guest Uploads"},
+            {"kind": "USER_UPLOAD", "name": "User Uploads"},
         ]
         
-        for source in media_sources:
-            existing = db.query(MediaSource).filter(MediaSource.kind == source.kind).first()
-            if not existing:
-                db.add(source)
-                print(f"Created media source: {source.name}")
+        # One multi-row INSERT; the unique kind index makes the database skip
+        # sources that already exist
+        result = db.execute(
+            insert(MediaSource)
+            .values(media_sources)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite")
+        )
+        print(f"Created {result.rowcount} media source(s)")
         
         # Create admin user
         admin_user = db.query(User).filter(User.email == settings.admin_email).first()
@@ -46,7 +47,7 @@ def seed_database():
                 role="ADMIN",
                 email=settings.admin_email,
                 name="Admin User",
-                password_hash=pwd_context.hash(settings.admin_password),
+                password_hash=get_password_hash(settings.admin_password),
                 is_blocked=False
             )
             db.add(admin_user)
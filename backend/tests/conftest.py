@@ -3,20 +3,44 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import create_engine
+# Minimum bcrypt cost for passwords hashed during tests, by the app and the
+# user fixtures alike; must be set before the app's settings are loaded
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 from app.main import app
+from app.api import auth, media
 from app.core.database import Base, get_db
 from app.models.database import *
 from app.core.config import settings
+from app.services.media_service import MediaService
+from app.services.auth_service import get_password_hash
 
-# Test database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# Test database URL (in-memory)
+SQLALCHEMY_DATABASE_URL = "sqlite://"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# StaticPool keeps the single connection, and so the in-memory database, alive
+# for every session
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# pysqlite manages transactions itself and breaks SAVEPOINT; hand BEGIN over
+# to SQLAlchemy so each test can run inside one outer transaction
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_begin(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+@event.listens_for(engine, "begin")
+def _emit_begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
 def override_get_db():
     try:
         db = TestingSessionLocal()
@@ -26,33 +50,55 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+@pytest.fixture(scope="session", autouse=True)
+def db_schema():
+    """Create the schema once for the whole run"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
 @pytest.fixture(scope="function")
 def db_session():
-    """Create a fresh database for each test"""
-    Base.metadata.create_all(bind=engine)
+    """
+    Run each test inside a transaction that is rolled back afterwards
+    
+    Fixture and request sessions share the connection; their commits only
+    release SAVEPOINTs, so nothing outlives the test.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    TestingSessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint")
     db = TestingSessionLocal()
     try:
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
+        TestingSessionLocal.configure(bind=engine, join_transaction_mode="conservative_savepoint")
+        # Rolled-back IDs get reused, so drop anything cached from this test
+        auth._token_cache.clear()
+        media._list_cache.clear()
+        MediaService.invalidate_source_cache()
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client"""
+    """
+    Create one test client for the whole run
+
+    The app keeps no per-client state (auth is by bearer token, no cookies),
+    and every request gets its session from the per-test db_session setup.
+    """
     return TestClient(app)
 
 @pytest.fixture(scope="function")
 def admin_user(db_session):
     """Create an admin user for testing"""
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    
     user = User(
         role="ADMIN",
         email="admin@test.com",
         name="Test Admin",
-        password_hash=pwd_context.hash("testpass123"),
+        password_hash=get_password_hash("testpass123"),
         is_blocked=False
     )
     db_session.add(user)
@@ -63,14 +109,11 @@ def admin_user(db_session):
 @pytest.fixture(scope="function")
 def regular_user(db_session):
     """Create a regular user for testing"""
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    
     user = User(
         role="USER",
         email="user@test.com",
         name="Test User",
-        password_hash=pwd_context.hash("testpass123"),
+        password_hash=get_password_hash("testpass123"),
         is_blocked=False
     )
     db_session.add(user)
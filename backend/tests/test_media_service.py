@@ -0,0 +1,73 @@
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+
+from app.core.config import settings
+from app.models.media_source import MediaDTO
+from app.services.media_service import MediaService
+
+
+@contextmanager
+def count_statements(db_session):
+    """Collect the SQL statements executed on the session's connection"""
+    statements = []
+    connection = db_session.connection()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(connection, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture(scope="function")
+def media_items(db_session, admin_user, media_sources):
+    """Create 60 media items, each with tags and a comment"""
+    media_service = MediaService(db_session)
+    items = []
+    for i in range(60):
+        media = media_service.create_media(
+            MediaDTO(
+                kind="PHOTO",
+                title=f"Photo {i}",
+                tags=["family", f"tag{i % 5}"],
+                source_kind="ICLOUD",
+                source_ref=f"icloud-{i}"
+            ),
+            admin_user.id
+        )
+        media_service.add_comment_to_media(media.id, "Nice", admin_user.id)
+        items.append(media)
+    db_session.expunge_all()
+    return items
+
+
+def test_get_media_page_statement_budget(db_session, media_items):
+    """A full list page, with its tags and comment counts, takes at most 4 statements"""
+    media_service = MediaService(db_session)
+
+    with count_statements(db_session) as statements:
+        media_list = media_service.get_media(limit=50)
+        media_ids = [media.id for media in media_list]
+        tags_by_media = media_service.get_tag_names(media_ids)
+        comment_counts = media_service.get_comment_counts(media_ids)
+        sources = [media.source.kind for media in media_list]
+
+    assert len(media_list) == 50
+    assert all(len(tags_by_media[media_id]) == 2 for media_id in media_ids)
+    assert all(comment_counts[media_id] == 1 for media_id in media_ids)
+    assert set(sources) == {"ICLOUD"}
+    assert len(statements) <= 4, statements
+
+
+@pytest.mark.skipif(not settings.strict_orm_loading, reason="strict ORM loading is disabled")
+def test_get_media_raises_on_lazy_load(db_session, media_items):
+    """Touching a relationship the list query didn't load raises instead of querying"""
+    media_list = MediaService(db_session).get_media(limit=5)
+
+    with pytest.raises(InvalidRequestError):
+        media_list[0].comments